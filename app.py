@@ -3,19 +3,22 @@ AutoBlog Assistant - Personal Blog Content Generator
 A simple web app that generates researched blog posts with images using Google AI.
 """
 
+import asyncio
+import hashlib
+import io
 import os
+import queue
+import time
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from pathlib import Path
 
 # Load environment variables
 load_dotenv()
 
-# Import our modules
-from src.researcher import research_topic
-from src.blog_generator import generate_all_blogs
-from src.image_generator import generate_all_images
-from src.file_manager import save_outputs
+# Our src.* modules (and google-genai/Pillow behind them) are imported inside
+# the functions that use them, so the input page renders without loading them
 
 # Page configuration
 st.set_page_config(
@@ -26,7 +29,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -51,16 +54,42 @@ st.markdown("""
         margin: 0.5rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Example topics offered on the input page
+EXAMPLE_TOPICS = (
+    "The future of artificial intelligence",
+    "Sustainable living tips for beginners",
+    "Remote work productivity hacks",
+    "Healthy meal prep ideas",
+    "Travel photography tips",
+    "Personal finance for millennials"
+)
+
+
+@st.cache_resource
+def inject_css():
+    """Inject the custom CSS; Streamlit replays the cached element on reruns."""
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+
+inject_css()
 
 
 def check_api_keys():
-    """Check if Google API key is configured."""
-    google_key = os.getenv("GOOGLE_API_KEY", "")
+    """
+    Check if Google API key is configured.
 
-    if not google_key or google_key.startswith("your-"):
-        return ["GOOGLE_API_KEY"]
-    return []
+    The key is read from the environment once per session and kept in
+    session state, so reruns skip the lookup.
+    """
+    if "google_key" not in st.session_state:
+        google_key = os.getenv("GOOGLE_API_KEY", "")
+        if not google_key or google_key.startswith("your-"):
+            google_key = None
+        st.session_state.google_key = google_key
+
+    return [] if st.session_state.google_key else ["GOOGLE_API_KEY"]
 
 
 def main():
@@ -96,8 +125,14 @@ def main():
         show_results_page()
 
 
+@st.fragment
 def show_input_page():
-    """Show the topic input page."""
+    """
+    Show the topic input page.
+
+    Runs as a fragment so typing and switching options only rerun this page;
+    starting a generation still reruns the whole app to change step.
+    """
     st.markdown("### Enter Your Topic")
 
     # Topic input
@@ -149,23 +184,168 @@ def show_input_page():
                 st.session_state.step = "generating"
                 st.rerun()
 
-    # Example topics
+    # Example topics - one form, so picking one is a single submit
     with st.expander("Need inspiration? Try these topics:"):
-        examples = [
-            "The future of artificial intelligence",
-            "Sustainable living tips for beginners",
-            "Remote work productivity hacks",
-            "Healthy meal prep ideas",
-            "Travel photography tips",
-            "Personal finance for millennials"
+        with st.form("examples", border=False):
+            picked = None
+            cols = st.columns(3)
+            for i, example in enumerate(EXAMPLE_TOPICS):
+                if cols[i % 3].form_submit_button(example, use_container_width=True):
+                    picked = example
+
+        if picked:
+            st.session_state.topic = picked
+            st.session_state.image_style = "realistic"
+            st.session_state.output_type = "both"
+            st.session_state.step = "generating"
+            st.rerun()
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Short, non-reversible stand-in for the API key in cache keys."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+@st.cache_data(ttl=24 * 3600, show_spinner=False)
+def cached_research(topic: str, model: str, api_key_fingerprint: str, _api_key: str) -> dict:
+    """
+    Research a topic, reusing the result when the same topic comes up again.
+
+    Topics worded differently but meaning the same thing reuse earlier
+    research through the semantic cache. Streamlit leaves _api_key out of
+    the cache key; only its fingerprint is hashed, so switching keys starts
+    a fresh cache without storing the secret.
+    """
+    from src.researcher import research_cache_key, research_topic
+    from src.semantic_cache import embed_topic, find_similar_research, remember_research
+
+    # The semantic cache is only a shortcut; research still works without it
+    try:
+        embedding = embed_topic(topic, _api_key)
+    except Exception as e:
+        print(f"Failed to embed topic for semantic cache: {e}")
+        return research_topic(topic, _api_key, model)
+
+    research = find_similar_research(embedding, model)
+    if research is None:
+        research = research_topic(topic, _api_key, model)
+        remember_research(topic, embedding, research_cache_key(topic, model), model)
+    return research
+
+
+async def run_pipeline(
+    topic: str,
+    api_key: str,
+    image_style: str,
+    gen_text: bool,
+    gen_images: bool,
+    events: queue.Queue
+) -> dict:
+    """
+    Run research, blog writing and image generation as one async pipeline.
+
+    Each blog's image is started as soon as that blog is written, so image
+    generation overlaps with writing the remaining posts. Progress is
+    reported on the events queue as (stage, done, total) tuples, and the
+    text of each post being written as ("preview", index, text), with
+    text None once that post is finished.
+    """
+    from src.researcher import RESEARCH_MODEL, is_usable_research
+    from src.blog_generator import stream_blogs
+    from src.image_generator import generate_all_images, generate_blog_image
+
+    events.put(("research", 0, 1))
+    research = await asyncio.to_thread(
+        cached_research, topic, RESEARCH_MODEL, key_fingerprint(api_key), api_key
+    )
+    if not is_usable_research(research):
+        # Keep a bad response out of the in-memory cache too, so Try Again
+        # researches the topic afresh
+        cached_research.clear()
+    events.put(("research", 1, 1))
+
+    blogs = []
+    images = []
+    if gen_text:
+        written = {}
+        image_tasks = {}
+        images_done = 0
+
+        async def image_for(blog: dict):
+            nonlocal images_done
+            image = await generate_blog_image(blog, api_key, image_style)
+            images_done += 1
+            events.put(("images", images_done, 3))
+            return image
+
+        # Previews arrive once per streamed chunk but the page only polls
+        # once a second, so pass at most one every half second per post
+        last_preview = {}
+
+        def preview(i, text):
+            now = time.monotonic()
+            if now - last_preview.get(i, 0.0) >= 0.5:
+                last_preview[i] = now
+                events.put(("preview", i, text))
+
+        events.put(("blogs", 0, 3))
+        async for i, blog in stream_blogs(topic, research, api_key, preview):
+            written[i] = blog
+            events.put(("preview", i, None))
+            events.put(("blogs", len(written), 3))
+            if gen_images:
+                image_tasks[i] = asyncio.create_task(image_for(blog))
+
+        blogs = [written[i] for i in sorted(written)]
+        images = list(await asyncio.gather(*(image_tasks[i] for i in sorted(image_tasks))))
+    elif gen_images:
+        # For images-only, create minimal blog stubs so image generator has titles
+        summary = research.get("summary", topic) if isinstance(research, dict) else str(research)[:500]
+        blogs = [
+            {"title": f"{topic} - Image {i+1}", "content": summary, "word_count": 0,
+             "meta_description": topic, "meta_preview": topic[:100]}
+            for i in range(3)
         ]
-        for example in examples:
-            if st.button(example, key=f"example_{example}"):
-                st.session_state.topic = example
-                st.session_state.image_style = "realistic"
-                st.session_state.output_type = "both"
-                st.session_state.step = "generating"
-                st.rerun()
+
+        def image_progress(current, total):
+            events.put(("images", current, total))
+
+        images = await generate_all_images(blogs, api_key, image_style, image_progress)
+
+    return {"research": research, "blogs": blogs, "images": images}
+
+
+def run_generation(
+    topic: str,
+    api_key: str,
+    image_style: str,
+    gen_text: bool,
+    gen_images: bool,
+    events: queue.Queue
+) -> dict:
+    """
+    Generate and save all content. Runs on a worker thread, off the script thread.
+
+    Returns:
+        The results dict shown on the results page
+    """
+    from src.file_manager import save_outputs
+
+    generated = asyncio.run(
+        run_pipeline(topic, api_key, image_style, gen_text, gen_images, events)
+    )
+
+    events.put(("saving", 0, 1))
+    saved = save_outputs(topic, generated["blogs"], generated["images"])
+    events.put(("saving", 1, 1))
+
+    return {"topic": topic, **generated, "saved": saved}
+
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by all sessions for running generation jobs."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="autoblog")
 
 
 def show_generating_page():
@@ -181,88 +361,106 @@ def show_generating_page():
     st.markdown(f"### Generating {label} for: *{topic}*")
     st.markdown("---")
 
-    # Progress tracking
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+    if "generation_error" in st.session_state:
+        st.error(f"An error occurred: {st.session_state.generation_error}")
+        st.markdown("---")
+        if st.button("Try Again"):
+            del st.session_state.generation_error
+            st.session_state.step = "input"
+            st.rerun()
+        return
 
-    total_steps = (1 if gen_text else 0) + (1 if gen_images else 0) + 2  # research + save always happen
-    current_step = 1
+    # Start the job once; reruns of this page just keep watching it
+    if "job" not in st.session_state:
+        events = queue.Queue()
+        future = get_executor().submit(
+            run_generation,
+            topic, st.session_state.google_key, image_style, gen_text, gen_images, events
+        )
+        st.session_state.job = {"future": future, "events": events, "stages": {}, "previews": {}}
+
+    show_progress(gen_text, gen_images)
+
+
+@st.fragment(run_every=1.0)
+def show_progress(gen_text: bool, gen_images: bool):
+    """Poll the running generation job and redraw only the progress block."""
+    job = st.session_state.job
+    stages = job["stages"]
+    while True:
+        try:
+            stage, *data = job["events"].get_nowait()
+        except queue.Empty:
+            break
+        if stage != "preview":
+            stages[stage] = tuple(data)
+        elif data[1] is None:
+            job["previews"].pop(data[0], None)
+        else:
+            job["previews"][data[0]] = data[1]
+
+    # Each stage gets a share of the bar up to 90%, the rest is for saving files
+    weights = {"research": 20, "blogs": 40 if gen_text else 0, "images": 30 if gen_images else 0}
+    pct = sum(weights[s] * d / t for s, (d, t) in stages.items() if s in weights) * 90 / sum(weights.values())
+    if "saving" in stages:
+        pct = 90 + 10 * stages["saving"][0]
+    st.progress(int(pct))
+
+    if "saving" in stages:
+        st.markdown("**Saving files...**")
+    elif stages.get("research", (0, 1))[0] < 1:
+        st.markdown("**Researching topic...**")
+    else:
+        parts = []
+        if "blogs" in stages:
+            parts.append(f"Blog posts written: {stages['blogs'][0]}/{stages['blogs'][1]}")
+        if "images" in stages:
+            parts.append(f"Images created: {stages['images'][0]}/{stages['images'][1]}")
+        st.markdown("**" + " | ".join(parts or ["Research complete"]) + "**")
+
+    # Live preview of the first post still streaming in
+    if job["previews"] and "saving" not in stages:
+        index = min(job["previews"])
+        st.caption(f"Writing blog post {index + 1}...")
+        with st.container(height=300):
+            st.markdown(job["previews"][index])
+
+    future = job["future"]
+    if not future.done():
+        return
 
+    del st.session_state.job
     try:
-        # Get Google API key
-        google_key = os.getenv("GOOGLE_API_KEY")
-
-        # Step 1: Research
-        status_text.markdown(f"**Step {current_step}/{total_steps}:** Researching topic...")
-        progress_bar.progress(10)
-
-        research = research_topic(topic, google_key)
-        progress_bar.progress(25)
-        current_step += 1
-
-        # Step 2: Generate blogs (if needed)
-        blogs = []
-        if gen_text:
-            status_text.markdown(f"**Step {current_step}/{total_steps}:** Writing blog posts... (this may take a few minutes)")
-            progress_bar.progress(30)
-
-            def blog_progress(current, total):
-                pct = 30 + int((current / total) * 30)
-                progress_bar.progress(pct)
-                status_text.markdown(f"**Step {current_step}/{total_steps}:** Writing blog post {current} of {total}...")
-
-            blogs = generate_all_blogs(topic, research, google_key, blog_progress)
-            progress_bar.progress(60)
-            current_step += 1
-        elif gen_images:
-            # For images-only, create minimal blog stubs so image generator has titles
-            summary = research.get("summary", topic) if isinstance(research, dict) else str(research)[:500]
-            blogs = [
-                {"title": f"{topic} - Image {i+1}", "content": summary, "word_count": 0, "meta_description": topic}
-                for i in range(3)
-            ]
-
-        # Step 3: Generate images (if needed)
-        images = []
-        if gen_images:
-            status_text.markdown(f"**Step {current_step}/{total_steps}:** Creating featured images...")
-            progress_bar.progress(65)
-
-            def image_progress(current, total):
-                pct = 65 + int((current / total) * 25)
-                progress_bar.progress(pct)
-                status_text.markdown(f"**Step {current_step}/{total_steps}:** Creating image {current} of {total}...")
-
-            images = generate_all_images(blogs, google_key, image_style, image_progress)
-            progress_bar.progress(90)
-            current_step += 1
-
-        # Final step: Save files
-        status_text.markdown(f"**Step {current_step}/{total_steps}:** Saving files...")
-        saved = save_outputs(topic, blogs, images)
-        progress_bar.progress(100)
-
-        # Store results
-        st.session_state.results = {
-            "topic": topic,
-            "research": research,
-            "blogs": blogs,
-            "images": images,
-            "saved": saved
-        }
+        st.session_state.results = future.result()
         st.session_state.step = "results"
-        st.rerun()
-
     except Exception as e:
-        st.error(f"An error occurred: {str(e)}")
-        st.markdown("---")
-        if st.button("Try Again"):
-            st.session_state.step = "input"
-            st.rerun()
+        st.session_state.generation_error = str(e)
+    st.rerun()
 
 
+@st.cache_resource(show_spinner=False, max_entries=32)
+def preview_image(image_bytes: bytes) -> bytes:
+    """
+    Downscale a generated image to a WebP preview for the results page.
+
+    The full-size PNG is still what gets saved to disk.
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(image_bytes))
+    image.thumbnail((1024, 1024))
+    buffer = io.BytesIO()
+    image.save(buffer, "WEBP", quality=82)
+    return buffer.getvalue()
+
+
+@st.fragment
 def show_results_page():
-    """Show the results page with previews and downloads."""
+    """
+    Show the results page with previews and downloads.
+
+    Runs as a fragment so download clicks only rerun this page.
+    """
     results = st.session_state.results
     topic = results["topic"]
     blogs = results["blogs"]
@@ -287,28 +485,24 @@ def show_results_page():
             title = blog.get("title", f"Blog Post {i+1}")
             content = blog.get("content", "")
             word_count = blog.get("word_count", 0)
-            meta = blog.get("meta_description", "")
+            meta_preview = blog.get("meta_preview", "")
 
             st.markdown(f"**{title}**")
-            st.caption(f"{word_count} words | {meta[:100]}...")
+            st.caption(f"{word_count} words | {meta_preview}...")
 
             # Show image if available
             if i < len(images) and images[i]:
-                st.image(images[i], caption=f"Featured Image for Blog {i+1}", use_container_width=True)
+                st.image(preview_image(images[i]), caption=f"Featured Image for Blog {i+1}", use_container_width=True)
 
             # Preview content
             with st.expander("Preview content"):
                 st.markdown(content[:1000] + "...")
 
             # Download button
-            blog_path = saved["blogs"][i]
-            with open(blog_path, "r", encoding="utf-8") as f:
-                blog_content = f.read()
-
             st.download_button(
                 label=f"Download Blog (Markdown)",
-                data=blog_content,
-                file_name=blog_path.name,
+                data=saved["blog_contents"][i],
+                file_name=saved["blogs"][i].name,
                 mime="text/markdown",
                 key=f"download_blog_{i}"
             )
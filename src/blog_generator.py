@@ -2,20 +2,51 @@
 Blog Generator Module - AI-powered blog post generation using Google Gemini
 """
 
+import asyncio
+import re
+import time
 from google import genai
 from google.genai import types
-from typing import Optional
+from typing import AsyncIterator, Optional
 
+from src.cache import cache_get, cache_set, prompt_key
+from src.gemini_client import get_client
+from src.ratelimit import limiter, retry_on_transient_error
 
-def generate_blog(
+BLOG_MODEL = "gemini-2.5-flash"
+
+# Minimum seconds between on_chunk calls while a post streams in
+CHUNK_INTERVAL = 0.2
+
+# Matches a Markdown H1 heading ("## " can't match: its second char isn't a space)
+H1_RE = re.compile(r'^# (.+?)\s*$')
+
+# Title used when the post has no H1 heading
+UNTITLED = "Untitled Blog Post"
+
+# Markdown emphasis and code marks, dropped from excerpts
+EMPHASIS_RE = re.compile(r'[*_`]')
+
+# Matches the "Meta description: ..." line the blog prompt asks for at the end
+META_LINE_RE = re.compile(r'^[*_\s]*meta description[*_\s]*:[*_\s]*(.+?)[*_\s]*$', re.IGNORECASE)
+
+# A horizontal rule ("---", "***", "___") at the very end of the text
+TRAILING_RULE_RE = re.compile(r'\n[ \t]*([-*_])(?:[ \t]*\1){2,}[ \t]*$')
+
+# Quote marks the model sometimes wraps the meta description in
+QUOTES = "\"'\u201c\u201d\u2018\u2019"
+
+
+async def generate_blog(
     topic: str,
     angle: dict,
     research: dict,
     api_key: str,
-    target_words: int = 2250
+    target_words: int = 2250,
+    on_chunk: Optional[callable] = None
 ) -> dict:
     """
-    Generate a blog post using Google Gemini AI.
+    Generate a blog post using Google Gemini AI, streaming the response.
 
     Args:
         topic: The main topic
@@ -23,6 +54,9 @@ def generate_blog(
         research: Research data from researcher module
         api_key: Google API key
         target_words: Target word count (default 2250, range 2000-2500)
+        on_chunk: Optional callback function(text_so_far), called at most
+            every CHUNK_INTERVAL seconds as the post streams in, and once
+            with the complete text
 
     Returns:
         dict with keys:
@@ -30,23 +64,22 @@ def generate_blog(
             - content: Full blog post in Markdown format
             - meta_description: SEO meta description
             - word_count: Approximate word count
+            - meta_preview: First 100 characters of the meta description
     """
-    client = genai.Client(api_key=api_key)
-
     # Prepare research context
     research_summary = research.get("summary", "")
     key_facts = research.get("key_facts", [])
     facts_text = "\n".join(f"- {fact}" for fact in key_facts[:10])
 
-    prompt = f"""You are an expert blog writer. Write a comprehensive, engaging blog post based on the following information.
+    # Everything up to the angle is identical for all 3 posts of a topic, so
+    # it goes first. The 3 posts are requested together, so they can't share
+    # Gemini's implicit prefix cache with each other; a post requested later
+    # (a retry, or Try Again after a partial failure) can hit it
+    prompt = f"""You are an expert blog writer. Write a comprehensive, engaging blog post based on the following information, taking the angle given at the end.
 
 ## Topic
 {topic}
 
-## Blog Angle/Focus
-Title: {angle.get('title', topic)}
-Approach: {angle.get('description', 'Write a comprehensive article on this topic.')}
-
 ## Research to Incorporate
 {research_summary}
 
@@ -82,49 +115,151 @@ Approach: {angle.get('description', 'Write a comprehensive article on this topic
    - Address potential questions readers might have
    - Avoid fluff - every paragraph should add value
 
-Write the complete blog post in Markdown format. Begin with the title as an H1 heading."""
+## Blog Angle/Focus
+Title: {angle.get('title', topic)}
+Approach: {angle.get('description', 'Write a comprehensive article on this topic.')}
+
+Write the complete blog post in Markdown format. Begin with the title as an H1 heading.
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            max_output_tokens=8192,
-            temperature=0.7
-        )
-    )
+After the blog post, add one final line in the form "Meta description: <text>" containing a compelling SEO meta description for the post (150-160 characters, including the main keyword, no quotes)."""
+
+    config = {"max_output_tokens": 8192, "temperature": 0.7}
+
+    cache_key = prompt_key(BLOG_MODEL, prompt, config)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        if on_chunk:
+            on_chunk(cached["content"])
+        return cached
 
-    content = response.text
+    client = get_client(api_key)
+
+    text, complete = await stream_blog_text(client, prompt, config, on_chunk)
+
+    # The meta description comes back in the same response; only fall back
+    # to a separate request if the model left it out
+    content, meta_description = split_meta_description(text)
 
     # Extract title from content
     title = extract_title(content)
 
-    # Generate meta description
-    meta_description = generate_meta_description(client, title, content)
+    if not meta_description:
+        try:
+            meta_description = await generate_meta_description(client, title, content)
+        except Exception as e:
+            # Keep the post rather than losing it over its meta description
+            print(f"Failed to generate meta description for '{title}': {e}")
+            meta_description = excerpt_meta_description(content)
 
     # Count words
     word_count = len(content.split())
 
-    return {
+    blog = {
         "title": title,
         "content": content,
         "meta_description": meta_description,
-        "word_count": word_count
+        "word_count": word_count,
+        "meta_preview": meta_description[:100]
     }
 
+    # Don't cache an empty, blocked or cut-off post, so Try Again asks again
+    if complete and content.strip() and title != UNTITLED:
+        cache_set(cache_key, blog)
+    return blog
+
+
+@retry_on_transient_error()
+async def stream_blog_text(
+    client: genai.Client,
+    prompt: str,
+    config: dict,
+    on_chunk: Optional[callable] = None
+) -> tuple:
+    """
+    Stream one blog post from Gemini.
+
+    Only this request is retried, so a failure in a later step (like the
+    meta description fallback) never regenerates the post.
+
+    Returns:
+        (text, complete) - complete is False if the model stopped early,
+        e.g. at the token limit or on a safety block
+    """
+    # Collect chunks in a list and only join them when the caller is due
+    # an update, rather than rebuilding the whole string on every chunk
+    parts = []
+    finish_reason = None
+    last_update = time.monotonic()
+    async with limiter:
+        stream = await client.aio.models.generate_content_stream(
+            model=BLOG_MODEL,
+            contents=prompt,
+            config=types.GenerateContentConfig(**config)
+        )
+    async for chunk in stream:
+        for candidate in chunk.candidates or ():
+            finish_reason = candidate.finish_reason or finish_reason
+        if chunk.text:
+            parts.append(chunk.text)
+            if on_chunk and time.monotonic() - last_update >= CHUNK_INTERVAL:
+                last_update = time.monotonic()
+                on_chunk("".join(parts))
+
+    text = "".join(parts)
+    if on_chunk:
+        on_chunk(text)
+    return text, finish_reason == types.FinishReason.STOP
+
 
 def extract_title(content: str) -> str:
     """
     Extract the title from the blog post content.
     """
-    lines = content.strip().split("\n")
-    for line in lines:
-        line = line.strip()
-        if line.startswith("# ") and not line.startswith("## "):
-            return line[2:].strip()
-    return "Untitled Blog Post"
+    # The prompt asks for the title first, so check the first line before
+    # splitting the whole post into lines
+    end = content.find("\n")
+    match = H1_RE.match((content if end == -1 else content[:end]).strip())
+    if match:
+        return match.group(1).strip()
+
+    for line in content.split("\n"):
+        match = H1_RE.match(line.strip())
+        if match:
+            return match.group(1).strip()
+    return UNTITLED
+
+
+def split_meta_description(content: str) -> tuple:
+    """
+    Split the trailing meta description line off a generated blog post.
+
+    Returns:
+        (content, meta_description) - meta_description is "" if not found
+    """
+    body, _, last_line = content.rstrip().rpartition("\n")
+    match = META_LINE_RE.match(last_line)
+    if not match:
+        return content, ""
 
+    # Drop the rule models like to put between the post and the meta line
+    body = TRAILING_RULE_RE.sub("", body.rstrip()).rstrip()
+    return body, match.group(1).strip().strip(QUOTES).strip()
 
-def generate_meta_description(
+
+def excerpt_meta_description(content: str, max_length: int = 155) -> str:
+    """
+    Build a plain-text meta description from the start of the post body.
+    """
+    lines = (line.strip().lstrip(">-•") for line in content.split("\n"))
+    text = " ".join(line.strip() for line in lines if line and not line.startswith("#"))
+    text = EMPHASIS_RE.sub("", text).replace('"', "'")
+    if len(text) <= max_length:
+        return text
+    return text[:max_length - 3].rsplit(" ", 1)[0] + "..."
+
+
+@retry_on_transient_error()
+async def generate_meta_description(
     client: genai.Client,
     title: str,
     content: str
@@ -135,12 +270,8 @@ def generate_meta_description(
     # Take first 1000 chars for context
     excerpt = content[:1000]
 
-    prompt = f"""Write a compelling SEO meta description for this blog post.
-
-Title: {title}
-
-Content excerpt:
-{excerpt}
+    # Static instructions first so the prefix is shared between calls
+    prompt = f"""Write a compelling SEO meta description for the blog post below.
 
 Requirements:
 - Between 150-160 characters
@@ -148,40 +279,54 @@ Requirements:
 - Be compelling and encourage clicks
 - Don't use quotes around it
 
-Write only the meta description, nothing else."""
+Write only the meta description, nothing else.
+
+Title: {title}
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            max_output_tokens=100,
-            temperature=0.7
+Content excerpt:
+{excerpt}"""
+
+    config = {"max_output_tokens": 100, "temperature": 0.7}
+
+    cache_key = prompt_key(BLOG_MODEL, prompt, config)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    async with limiter:
+        response = await client.aio.models.generate_content(
+            model=BLOG_MODEL,
+            contents=prompt,
+            config=types.GenerateContentConfig(**config)
         )
-    )
 
-    return response.text.strip()
+    meta_description = response.text.strip().strip(QUOTES).strip()
+    cache_set(cache_key, meta_description)
+    return meta_description
 
 
-def generate_all_blogs(
+async def stream_blogs(
     topic: str,
     research: dict,
     api_key: str,
-    progress_callback: Optional[callable] = None
-) -> list:
+    on_chunk: Optional[callable] = None
+) -> AsyncIterator[tuple]:
     """
-    Generate all 3 blog posts for the given topic.
+    Generate all 3 blog posts concurrently, yielding each one as soon as it
+    is written (so not necessarily in angle order).
 
     Args:
         topic: The main topic
         research: Research data from researcher module
         api_key: Google API key
-        progress_callback: Optional callback function(blog_number, total)
+        on_chunk: Optional callback function(index, text_so_far) for
+            streaming previews
 
-    Returns:
-        List of 3 blog post dicts
+    Yields:
+        (index, blog) tuples, where index is the 0-based blog number
     """
-    blogs = []
-    angles = research.get("angles", [])
+    # Copy the angles so padding never touches the (possibly cached) research
+    angles = list(research.get("angles", []))[:3]
 
     # Ensure we have 3 angles
     while len(angles) < 3:
@@ -190,11 +335,53 @@ def generate_all_blogs(
             "description": "An alternative exploration of this topic."
         })
 
-    for i, angle in enumerate(angles[:3]):
-        if progress_callback:
-            progress_callback(i + 1, 3)
+    async def write(i: int, angle: dict) -> tuple:
+        blog = await generate_blog(
+            topic, angle, research, api_key,
+            on_chunk=(lambda text: on_chunk(i, text)) if on_chunk else None
+        )
+        return i, blog
+
+    tasks = [asyncio.create_task(write(i, angle)) for i, angle in enumerate(angles)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Don't leave requests running if the caller stops early or one fails
+        for task in tasks:
+            task.cancel()
+
+
+def generate_all_blogs(
+    topic: str,
+    research: dict,
+    api_key: str,
+    progress_callback: Optional[callable] = None
+) -> list:
+    """
+    Generate all 3 blog posts for the given topic, blocking until they're done.
+
+    Runs stream_blogs on its own event loop, so it can't be called from
+    inside one; async code should iterate stream_blogs directly.
+
+    Args:
+        topic: The main topic
+        research: Research data from researcher module
+        api_key: Google API key
+        progress_callback: Optional callback function(blogs_done, total)
+
+    Returns:
+        List of 3 blog post dicts
+    """
+    blogs = [None] * 3
 
-        blog = generate_blog(topic, angle, research, api_key)
-        blogs.append(blog)
+    async def collect():
+        done = 0
+        async for i, blog in stream_blogs(topic, research, api_key):
+            blogs[i] = blog
+            done += 1
+            if progress_callback:
+                progress_callback(done, 3)
 
+    asyncio.run(collect())
     return blogs
@@ -0,0 +1,50 @@
+"""
+Cache Module - Persistent on-disk cache for generated content
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+from diskcache import Cache
+
+# Cached results expire after a week
+CACHE_TTL = 7 * 24 * 3600
+
+_cache: Optional[Cache] = None
+
+
+def get_cache() -> Cache:
+    """
+    Get the shared cache, stored in .autoblog_cache in the project directory.
+    """
+    global _cache
+    if _cache is None:
+        _cache = Cache(str(Path(__file__).parent.parent / ".autoblog_cache"))
+    return _cache
+
+
+def prompt_key(model: str, prompt: str, config: dict) -> str:
+    """
+    Build the cache key for one model call from exactly what is sent.
+
+    Any change to the model, the prompt text or the generation config gives
+    a new key, so edited prompts never replay stale responses.
+    """
+    payload = f"{model}|{prompt}|{json.dumps(config, sort_keys=True)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_get(key: str) -> Any:
+    """
+    Look up a cached value, returning None on a miss.
+    """
+    return get_cache().get(key)
+
+
+def cache_set(key: str, value: Any) -> None:
+    """
+    Store a value in the cache for CACHE_TTL seconds.
+    """
+    get_cache().set(key, value, expire=CACHE_TTL)
@@ -4,9 +4,17 @@ File Manager Module - Local file saving and organization
 
 import os
 import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
+# Patterns used by slugify, compiled once
+SEPARATOR_RE = re.compile(r'[\s_]+')
+DISALLOWED_RE = re.compile(r'[^a-z0-9\-]')
+DASHES_RE = re.compile(r'-+')
+
 
 def slugify(text: str) -> str:
     """
@@ -15,11 +23,11 @@ def slugify(text: str) -> str:
     # Convert to lowercase
     text = text.lower()
     # Replace spaces and underscores with hyphens
-    text = re.sub(r'[\s_]+', '-', text)
+    text = SEPARATOR_RE.sub('-', text)
     # Remove non-alphanumeric characters (except hyphens)
-    text = re.sub(r'[^a-z0-9\-]', '', text)
+    text = DISALLOWED_RE.sub('', text)
     # Remove multiple consecutive hyphens
-    text = re.sub(r'-+', '-', text)
+    text = DASHES_RE.sub('-', text)
     # Remove leading/trailing hyphens
     text = text.strip('-')
     # Limit length
@@ -54,21 +62,44 @@ def create_topic_folder(topic: str, base_path: str = None) -> Path:
 
     topic_folder = output_dir / topic_slug
 
-    # Handle existing folders by adding a number suffix
-    if topic_folder.exists():
-        counter = 1
-        while (output_dir / f"{topic_slug}-{counter}").exists():
-            counter += 1
-        topic_folder = output_dir / f"{topic_slug}-{counter}"
+    # Handle existing folders by adding a millisecond timestamp suffix,
+    # rather than probing numbered names until a free one turns up
+    try:
+        topic_folder.mkdir(parents=True)
+    except FileExistsError:
+        topic_folder = output_dir / f"{topic_slug}-{int(time.time() * 1000)}"
+        try:
+            topic_folder.mkdir(parents=True)
+        except FileExistsError:
+            # Two saves of the same topic in the same millisecond
+            topic_folder = output_dir / f"{topic_slug}-{uuid.uuid4().hex[:8]}"
+            topic_folder.mkdir(parents=True)
 
-    topic_folder.mkdir(parents=True, exist_ok=True)
     return topic_folder
 
 
+def render_blog_markdown(blog: dict) -> str:
+    """
+    Render a blog post as Markdown with its meta description as YAML frontmatter.
+    """
+    title = blog.get("title", "Blog Post")
+    meta_description = blog.get("meta_description", "")
+
+    frontmatter = f"""---
+title: "{title}"
+description: "{meta_description}"
+---
+
+"""
+
+    return frontmatter + blog.get("content", "")
+
+
 def save_blog(
     folder: Path,
     blog: dict,
-    index: int
+    index: int,
+    markdown: Optional[str] = None
 ) -> Path:
     """
     Save a blog post as a Markdown file.
@@ -77,13 +108,12 @@ def save_blog(
         folder: Output folder path
         blog: Blog dict with 'title', 'content', 'meta_description'
         index: Blog number (1, 2, or 3)
+        markdown: Optional pre-rendered file content from render_blog_markdown
 
     Returns:
         Path to the saved file
     """
     title = blog.get("title", f"Blog Post {index}")
-    content = blog.get("content", "")
-    meta_description = blog.get("meta_description", "")
 
     # Create filename from title
     title_slug = slugify(title)
@@ -91,15 +121,7 @@ def save_blog(
 
     file_path = folder / filename
 
-    # Add meta description as YAML frontmatter
-    frontmatter = f"""---
-title: "{title}"
-description: "{meta_description}"
----
-
-"""
-
-    full_content = frontmatter + content
+    full_content = markdown if markdown is not None else render_blog_markdown(blog)
 
     with open(file_path, "w", encoding="utf-8") as f:
         f.write(full_content)
@@ -107,6 +129,30 @@ description: "{meta_description}"
     return file_path
 
 
+def write_media_file(file_path: Path, data: bytes) -> None:
+    """
+    Write generated media straight from its buffer, then let the OS drop it
+    from the page cache.
+
+    Images and audio are written once and never read back from disk (the
+    app keeps its own copy in memory), so there's no point caching them.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    # 0o666 like open(..., "wb"), so the umask decides the permissions
+    fd = os.open(file_path, flags, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        # Not available on macOS or Windows. Dirty pages can't be dropped,
+        # so flush them to disk first or the advice is ignored
+        if hasattr(os, "posix_fadvise"):
+            os.fdatasync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
 def save_image(
     folder: Path,
     image_bytes: bytes,
@@ -133,8 +179,7 @@ def save_image(
 
     file_path = folder / filename
 
-    with open(file_path, "wb") as f:
-        f.write(image_bytes)
+    write_media_file(file_path, image_bytes)
 
     return file_path
 
@@ -165,8 +210,7 @@ def save_audio(
 
     file_path = folder / filename
 
-    with open(file_path, "wb") as f:
-        f.write(audio_bytes)
+    write_media_file(file_path, audio_bytes)
 
     return file_path
 
@@ -192,40 +236,31 @@ def save_outputs(
         dict with keys:
             - folder: Path to the output folder
             - blogs: List of blog file paths
+            - blog_contents: List of the Markdown written for each blog
             - images: List of image file paths (None for failed images)
             - audios: List of audio file paths (None for failed audio)
     """
     folder = create_topic_folder(topic, base_path)
-
-    saved_blogs = []
-    saved_images = []
-    saved_audios = []
-
-    # Save blogs
-    for i, blog in enumerate(blogs, 1):
-        blog_path = save_blog(folder, blog, i)
-        saved_blogs.append(blog_path)
-
-    # Save images
-    for i, (image_bytes, blog) in enumerate(zip(images, blogs), 1):
-        image_path = save_image(
-            folder,
-            image_bytes,
-            i,
-            blog.get("title", "")
-        )
-        saved_images.append(image_path)
-
-    # Save audio files if provided
-    if audios:
-        for i, (audio_bytes, blog) in enumerate(zip(audios, blogs), 1):
-            audio_path = save_audio(
-                folder,
-                audio_bytes,
-                i,
-                blog.get("title", "")
-            )
-            saved_audios.append(audio_path)
+    blog_contents = [render_blog_markdown(blog) for blog in blogs]
+
+    # The writes are independent, so overlap them on a thread pool
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        blog_futures = [
+            executor.submit(save_blog, folder, blog, i, markdown)
+            for i, (blog, markdown) in enumerate(zip(blogs, blog_contents), 1)
+        ]
+        image_futures = [
+            executor.submit(save_image, folder, image_bytes, i, blog.get("title", ""))
+            for i, (image_bytes, blog) in enumerate(zip(images, blogs), 1)
+        ]
+        audio_futures = [
+            executor.submit(save_audio, folder, audio_bytes, i, blog.get("title", ""))
+            for i, (audio_bytes, blog) in enumerate(zip(audios or [], blogs), 1)
+        ]
+
+        saved_blogs = [future.result() for future in blog_futures]
+        saved_images = [future.result() for future in image_futures]
+        saved_audios = [future.result() for future in audio_futures]
 
     # Create an index file with links to all content
     create_index_file(folder, topic, blogs, saved_blogs, saved_images, saved_audios)
@@ -233,6 +268,7 @@ def save_outputs(
     return {
         "folder": folder,
         "blogs": saved_blogs,
+        "blog_contents": blog_contents,
         "images": saved_images,
         "audios": saved_audios
     }
@@ -249,44 +285,44 @@ def create_index_file(
     """
     Create an index file listing all generated content.
     """
-    index_content = f"""# {topic} - Generated Content
+    parts = [f"""# {topic} - Generated Content
 
 ## Blog Posts
 
-"""
+"""]
 
     for i, (blog, blog_path) in enumerate(zip(blogs, blog_paths), 1):
         title = blog.get("title", f"Blog Post {i}")
         word_count = blog.get("word_count", 0)
         filename = blog_path.name
-        index_content += f"{i}. [{title}]({filename}) ({word_count} words)\n"
+        parts.append(f"{i}. [{title}]({filename}) ({word_count} words)\n")
 
-    index_content += "\n## Featured Images\n\n"
+    parts.append("\n## Featured Images\n\n")
 
     for i, image_path in enumerate(image_paths, 1):
         if image_path:
             filename = image_path.name
-            index_content += f"{i}. ![Image {i}]({filename})\n"
+            parts.append(f"{i}. ![Image {i}]({filename})\n")
         else:
-            index_content += f"{i}. (Image generation failed)\n"
+            parts.append(f"{i}. (Image generation failed)\n")
 
     if audio_paths:
-        index_content += "\n## Audio Overviews\n\n"
+        parts.append("\n## Audio Overviews\n\n")
         for i, audio_path in enumerate(audio_paths, 1):
             if audio_path:
                 filename = audio_path.name
-                index_content += f"{i}. [Audio Overview {i}]({filename})\n"
+                parts.append(f"{i}. [Audio Overview {i}]({filename})\n")
             else:
-                index_content += f"{i}. (Audio generation failed)\n"
+                parts.append(f"{i}. (Audio generation failed)\n")
 
-    index_content += f"""
+    parts.append("""
 
 ---
 Generated by AutoBlog Assistant
-"""
+""")
 
     index_path = folder / "README.md"
     with open(index_path, "w", encoding="utf-8") as f:
-        f.write(index_content)
+        f.writelines(parts)
 
     return index_path
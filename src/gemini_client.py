@@ -0,0 +1,35 @@
+"""
+Gemini Client Module - Shared google-genai clients
+"""
+
+import asyncio
+import threading
+
+from google import genai
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key: str) -> genai.Client:
+    """
+    Get a shared Gemini client for the API key, so calls reuse its connections.
+
+    The SDK's async connection pool belongs to the event loop it was first
+    used on, so code running inside an event loop gets one client per loop.
+    Sync callers share one client per key.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    key = (api_key, loop)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # Drop clients whose event loop has finished
+            for stale in [k for k in _clients if k[1] is not None and k[1].is_closed()]:
+                del _clients[stale]
+            client = _clients[key] = genai.Client(api_key=api_key)
+    return client
@@ -2,12 +2,26 @@
 Image Generator Module - Using Gemini's native image generation (Nano Banana Pro)
 """
 
-from google import genai
+import asyncio
 from google.genai import types
 from typing import Optional
 
+from src.cache import cache_get, cache_set, prompt_key
+from src.gemini_client import get_client
+from src.ratelimit import limiter, retry_on_transient_error
 
-def generate_image(
+IMAGE_MODEL = "gemini-2.0-flash-exp-image-generation"
+
+# Style descriptions
+STYLE_DESCRIPTIONS = {
+    "realistic": "photorealistic, high quality photograph, professional lighting",
+    "illustration": "modern digital illustration, clean vector style, vibrant colors",
+    "artistic": "artistic, creative composition, visually striking, contemporary art"
+}
+
+
+@retry_on_transient_error()
+async def generate_image(
     blog_title: str,
     blog_content: str,
     api_key: str,
@@ -25,35 +39,38 @@ def generate_image(
     Returns:
         PNG image as bytes
     """
-    client = genai.Client(api_key=api_key)
-
     # Create image prompt
     image_prompt = create_image_prompt(blog_title, blog_content, style)
 
+    config = {"response_modalities": ["IMAGE", "TEXT"]}
+
+    cache_key = prompt_key(IMAGE_MODEL, image_prompt, config)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    client = get_client(api_key)
+
     # Use Gemini's native image generation model
-    response = client.models.generate_content(
-        model="gemini-2.0-flash-exp-image-generation",
-        contents=image_prompt,
-        config=types.GenerateContentConfig(
-            response_modalities=["IMAGE", "TEXT"],
+    async with limiter:
+        response = await client.aio.models.generate_content(
+            model=IMAGE_MODEL,
+            contents=image_prompt,
+            config=types.GenerateContentConfig(**config)
         )
-    )
 
     # Extract image from response
-    # Response has multiple parts - find the one with image data
-    if response.candidates:
-        for candidate in response.candidates:
-            if candidate.content and candidate.content.parts:
-                for part in candidate.content.parts:
-                    # Check if this part has inline_data (image)
-                    try:
-                        if part.inline_data and part.inline_data.data:
-                            image_data = part.inline_data.data
-                            # Verify it's actual image data (should be large)
-                            if isinstance(image_data, bytes) and len(image_data) > 1000:
-                                return image_data
-                    except Exception:
-                        continue
+    # Response has multiple parts - return the first one with image data
+    for candidate in response.candidates or ():
+        content = getattr(candidate, "content", None)
+        for part in getattr(content, "parts", None) or ():
+            inline_data = getattr(part, "inline_data", None)
+            image_data = getattr(inline_data, "data", None)
+            # Verify it's actual image data (should be large)
+            if isinstance(image_data, (bytes, bytearray)) and len(image_data) > 1000:
+                image_data = bytes(image_data)
+                cache_set(cache_key, image_data)
+                return image_data
 
     raise Exception("No image was generated in response")
 
@@ -66,14 +83,7 @@ def create_image_prompt(
     """
     Create an image prompt based on blog content.
     """
-    # Style descriptions
-    style_descriptions = {
-        "realistic": "photorealistic, high quality photograph, professional lighting",
-        "illustration": "modern digital illustration, clean vector style, vibrant colors",
-        "artistic": "artistic, creative composition, visually striking, contemporary art"
-    }
-
-    style_desc = style_descriptions.get(style, style_descriptions["realistic"])
+    style_desc = STYLE_DESCRIPTIONS.get(style, STYLE_DESCRIPTIONS["realistic"])
 
     # Build prompt
     prompt = f"Generate a featured image for a blog post titled: {blog_title}. Style: {style_desc}. The image should be professional, visually appealing, and contain no text."
@@ -81,40 +91,57 @@ def create_image_prompt(
     return prompt
 
 
-def generate_all_images(
+async def generate_blog_image(
+    blog: dict,
+    api_key: str,
+    style: str = "realistic"
+) -> Optional[bytes]:
+    """
+    Generate the featured image for a single blog post.
+
+    Returns:
+        PNG image as bytes, or None if generation failed
+    """
+    title = blog.get("title", "Blog Post")
+    try:
+        return await generate_image(title, blog.get("content", ""), api_key, style)
+    except Exception as e:
+        print(f"Failed to generate image for '{title}': {e}")
+        return None
+
+
+async def generate_all_images(
     blogs: list,
     api_key: str,
     style: str = "realistic",
-    progress_callback: Optional[callable] = None
+    progress_callback: Optional[callable] = None,
+    concurrency: int = 3
 ) -> list:
     """
-    Generate featured images for all blog posts.
+    Generate featured images for all blog posts concurrently.
 
     Args:
         blogs: List of blog post dicts (with 'title' and 'content' keys)
         api_key: Google API key
         style: Image style preference
-        progress_callback: Optional callback function(image_number, total)
+        progress_callback: Optional callback function(images_done, total)
+        concurrency: Maximum number of image requests in flight at once
 
     Returns:
-        List of image bytes
+        List of image bytes, in the same order as blogs
     """
-    images = []
+    semaphore = asyncio.Semaphore(concurrency)
+    images = [None] * len(blogs)
+
+    async def generate_one(i: int, blog: dict):
+        async with semaphore:
+            images[i] = await generate_blog_image(blog, api_key, style)
+
+    tasks = [asyncio.create_task(generate_one(i, blog)) for i, blog in enumerate(blogs)]
 
-    for i, blog in enumerate(blogs):
+    for done, task in enumerate(asyncio.as_completed(tasks), 1):
+        await task
         if progress_callback:
-            progress_callback(i + 1, len(blogs))
-
-        try:
-            image_bytes = generate_image(
-                blog.get("title", "Blog Post"),
-                blog.get("content", ""),
-                api_key,
-                style
-            )
-            images.append(image_bytes)
-        except Exception as e:
-            print(f"Failed to generate image {i + 1}: {e}")
-            images.append(None)
+            progress_callback(done, len(blogs))
 
     return images
@@ -0,0 +1,154 @@
+"""
+Rate Limit Module - Proactive throttling and retry for Google API calls
+"""
+
+import asyncio
+import functools
+import inspect
+import os
+import random
+import threading
+import time
+
+from google.genai import errors
+
+
+class RateLimiter:
+    """
+    Token bucket allowing max_rate calls per time_period seconds.
+
+    Works as both a regular and an async context manager, so the same
+    limiter throttles sync calls made from worker threads and async calls
+    made from the event loop.
+    """
+
+    def __init__(self, max_rate: int, time_period: float = 60.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = float(max_rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Take a token and return how long the caller must wait before using it.
+
+        The bucket may go negative; each caller then waits its turn for the
+        tokens that are still refilling.
+        """
+        with self._lock:
+            now = time.monotonic()
+            rate = self.max_rate / self.time_period
+            self._tokens = min(self.max_rate, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / rate
+
+    def __enter__(self):
+        time.sleep(self._reserve())
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    async def __aenter__(self):
+        await asyncio.sleep(self._reserve())
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+DEFAULT_RPM = 60
+
+
+def requests_per_minute() -> int:
+    """
+    Read the GEMINI_RPM quota, falling back to DEFAULT_RPM if it isn't a
+    positive whole number.
+    """
+    value = os.getenv("GEMINI_RPM", str(DEFAULT_RPM))
+    try:
+        rpm = int(value)
+    except ValueError:
+        rpm = 0
+    if rpm < 1:
+        print(f"Ignoring invalid GEMINI_RPM={value!r}; using {DEFAULT_RPM}")
+        return DEFAULT_RPM
+    return rpm
+
+
+# Shared limiter for all Gemini calls, sized to the requests-per-minute quota
+limiter = RateLimiter(requests_per_minute(), 60)
+
+
+# Rate limiting and transient server errors, worth retrying after a pause
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def retry_delay(error: errors.APIError, attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    How long to wait before retrying a failed call.
+
+    Uses the server's Retry-After header when it sends one, otherwise
+    exponential backoff with jitter so parallel callers don't retry in step.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    retry_after = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return max(0.0, min(max_delay, float(retry_after)))
+    except (TypeError, ValueError):
+        delay = min(max_delay, base_delay * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+def retry_on_transient_error(
+    max_attempts: int = 5,
+    base_delay: float = 2.0,
+    max_delay: float = 30.0
+):
+    """
+    Retry a sync or async function on HTTP 429 and transient 5xx errors.
+
+    The limiter should make 429s rare; they cover quota shared with other
+    clients or a GEMINI_RPM set higher than the real quota. 5xx errors are
+    usually a briefly overloaded model, so one failed call no longer sinks
+    the whole run.
+
+    Args:
+        max_attempts: Total number of attempts before giving up
+        base_delay: Delay in seconds before the first retry, doubled each time
+        max_delay: Longest single wait, including one asked for by Retry-After
+    """
+    def should_retry(error: Exception, attempt: int) -> bool:
+        return (
+            isinstance(error, errors.APIError)
+            and error.code in RETRY_STATUS_CODES
+            and attempt < max_attempts - 1
+        )
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                for attempt in range(max_attempts):
+                    try:
+                        return await func(*args, **kwargs)
+                    except Exception as e:
+                        if not should_retry(e, attempt):
+                            raise
+                        await asyncio.sleep(retry_delay(e, attempt, base_delay, max_delay))
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(max_attempts):
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    if not should_retry(e, attempt):
+                        raise
+                    time.sleep(retry_delay(e, attempt, base_delay, max_delay))
+        return wrapper
+
+    return decorator
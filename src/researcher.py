@@ -2,17 +2,52 @@
 Research Module - AI-powered topic research using Google Gemini
 """
 
-from google import genai
-from google.genai import types
+import re
 
+from google.genai import types
 
-def research_topic(topic: str, api_key: str) -> dict:
+from src.cache import cache_get, cache_set, prompt_key
+from src.gemini_client import get_client
+from src.ratelimit import limiter, retry_on_transient_error
+
+RESEARCH_MODEL = "gemini-2.5-flash"
+RESEARCH_CONFIG = {"max_output_tokens": 4096, "temperature": 0.7}
+
+# A Markdown header naming one of the sections asked for in the prompt
+SECTION_HEADER_RE = re.compile(
+    r'^#.*?(research summary|key facts|blog angles|suggested sources)',
+    re.IGNORECASE
+)
+SECTION_NAMES = {
+    "research summary": "summary",
+    "key facts": "key_facts",
+    "blog angles": "angles",
+    "suggested sources": "sources"
+}
+
+# A list item, capturing the item text: a "-", "*" or "•" bullet (space
+# optional), a "1." / "1)" / "1:" number, or a bare line opening in **bold**
+# or with a figure like "3.5 million" (both kept whole)
+LIST_ITEM_RE = re.compile(
+    r'^\s*(?:(?=\*\*|\d+[.):]\d)|(?:-|•|\*(?!\*))\s*|\d+[.):]\s*)(.+?)\s*$'
+)
+
+# Description given to the angles padded in when the response has too few
+PLACEHOLDER_ANGLE_DESCRIPTION = "An alternative viewpoint on the topic."
+
+# An angle title line, capturing the title without its number, header or bold markup
+ANGLE_TITLE_RE = re.compile(r'^(?:\d+\.|[#*\-\s])*(.*?)[*\s]*$')
+
+
+@retry_on_transient_error()
+def research_topic(topic: str, api_key: str, model: str = RESEARCH_MODEL) -> dict:
     """
     Research a topic using Google Gemini AI.
 
     Args:
         topic: The topic to research
         api_key: Google API key
+        model: Gemini model to research with
 
     Returns:
         dict with keys:
@@ -21,9 +56,50 @@ def research_topic(topic: str, api_key: str) -> dict:
             - angles: List of 3 unique blog angles
             - sources: Suggested source types
     """
-    client = genai.Client(api_key=api_key)
+    prompt = build_research_prompt(topic)
+    config = RESEARCH_CONFIG
+
+    cache_key = prompt_key(model, prompt, config)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    client = get_client(api_key)
+
+    with limiter:
+        response = client.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=types.GenerateContentConfig(**config)
+        )
+
+    response_text = response.text or ""
+
+    # Parse the response into structured data
+    result = parse_research_response(response_text)
+    result["raw_response"] = response_text
+
+    # Don't cache an empty, blocked or cut-off response, so Try Again asks again
+    if is_usable_research(result):
+        cache_set(cache_key, result)
+    return result
+
+
+def is_usable_research(research: dict) -> bool:
+    """
+    Whether parsed research has a summary and at least one real blog angle.
+    """
+    return bool(research.get("summary")) and any(
+        angle.get("description") != PLACEHOLDER_ANGLE_DESCRIPTION
+        for angle in research.get("angles", [])
+    )
 
-    prompt = f"""You are a professional research assistant. Research the following topic thoroughly and provide comprehensive information that can be used to write blog posts.
+
+def build_research_prompt(topic: str) -> str:
+    """
+    Build the research prompt for a topic.
+    """
+    return f"""You are a professional research assistant. Research the following topic thoroughly and provide comprehensive information that can be used to write blog posts.
 
 Topic: {topic}
 
@@ -46,22 +122,12 @@ List types of authoritative sources that would typically cover this topic (e.g.,
 
 Be thorough, accurate, and provide actionable information for content creation."""
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            max_output_tokens=4096,
-            temperature=0.7
-        )
-    )
-
-    response_text = response.text
-
-    # Parse the response into structured data
-    result = parse_research_response(response_text)
-    result["raw_response"] = response_text
 
-    return result
+def research_cache_key(topic: str, model: str = RESEARCH_MODEL) -> str:
+    """
+    Cache key under which research_topic stores its result for a topic.
+    """
+    return prompt_key(model, build_research_prompt(topic), RESEARCH_CONFIG)
 
 
 def parse_research_response(response: str) -> dict:
@@ -81,98 +147,81 @@ def parse_research_response(response: str) -> dict:
     lines = response.split("\n")
 
     for line in lines:
-        line_lower = line.lower().strip()
-
         # Detect section headers
-        if "research summary" in line_lower and line.startswith("#"):
-            if current_section and current_content:
-                sections[current_section] = process_section(current_section, current_content)
-            current_section = "summary"
-            current_content = []
-        elif "key facts" in line_lower and line.startswith("#"):
-            if current_section and current_content:
-                sections[current_section] = process_section(current_section, current_content)
-            current_section = "key_facts"
-            current_content = []
-        elif "blog angles" in line_lower and line.startswith("#"):
-            if current_section and current_content:
-                sections[current_section] = process_section(current_section, current_content)
-            current_section = "angles"
-            current_content = []
-        elif "suggested sources" in line_lower and line.startswith("#"):
-            if current_section and current_content:
-                sections[current_section] = process_section(current_section, current_content)
-            current_section = "sources"
+        header = SECTION_HEADER_RE.match(line)
+        if header:
+            _flush(sections, current_section, current_content)
+            current_section = SECTION_NAMES[header.group(1).lower()]
             current_content = []
         elif current_section:
             current_content.append(line)
 
     # Process the last section
-    if current_section and current_content:
-        sections[current_section] = process_section(current_section, current_content)
+    _flush(sections, current_section, current_content)
 
     return sections
 
 
+def _flush(sections: dict, section_type: str, content: list) -> None:
+    """Store a finished section, if there was one and it had any content."""
+    if section_type and content:
+        sections[section_type] = process_section(section_type, content)
+
+
 def process_section(section_type: str, content: list) -> any:
     """
     Process content based on section type.
     """
-    text = "\n".join(content).strip()
-
-    if section_type == "summary":
-        return text
-    elif section_type in ["key_facts", "sources"]:
+    if section_type in ["key_facts", "sources"]:
         # Extract list items
         items = []
         for line in content:
-            line = line.strip()
-            if line.startswith(("-", "*", "•")) or (len(line) > 2 and line[0].isdigit() and line[1] in ".):"):
-                # Remove bullet/number prefix
-                item = line.lstrip("-*•0123456789.): ").strip()
-                if item:
-                    items.append(item)
-        return items if items else [text] if text else []
+            item = LIST_ITEM_RE.match(line)
+            if item:
+                items.append(item.group(1))
+        if items:
+            return items
+
+        # Not a list after all - keep the whole section as one item
+        text = "\n".join(content).strip()
+        return [text] if text else []
     elif section_type == "angles":
         # Parse blog angles - look for numbered items or headers
         angles = []
-        current_angle = {"title": "", "description": ""}
+        title = ""
+        desc_parts = []
+
+        def close_angle():
+            if title:
+                angles.append({"title": title, "description": " ".join(desc_parts)})
 
         for line in content:
             line = line.strip()
             if not line:
-                if current_angle["title"]:
-                    angles.append(current_angle)
-                    current_angle = {"title": "", "description": ""}
+                close_angle()
+                title = ""
+                desc_parts = []
                 continue
 
             # Check for title patterns
             if line.startswith(("1.", "2.", "3.", "**", "###")):
-                if current_angle["title"]:
-                    angles.append(current_angle)
-                # Extract title
-                title = line.lstrip("123.#*- ").strip()
-                title = title.rstrip("*").strip()
-                current_angle = {"title": title, "description": ""}
-            elif current_angle["title"]:
+                close_angle()
+                title = ANGLE_TITLE_RE.match(line).group(1)
+                desc_parts = []
+            elif title:
                 # Add to description
-                desc_line = line.lstrip("-*• ").strip()
-                if current_angle["description"]:
-                    current_angle["description"] += " " + desc_line
-                else:
-                    current_angle["description"] = desc_line
+                desc_parts.append(line.lstrip("-*• "))
 
         # Don't forget the last angle
-        if current_angle["title"]:
-            angles.append(current_angle)
+        close_angle()
 
         # Ensure we have exactly 3 angles
         while len(angles) < 3:
             angles.append({
                 "title": f"Perspective {len(angles) + 1}",
-                "description": "An alternative viewpoint on the topic."
+                "description": PLACEHOLDER_ANGLE_DESCRIPTION
             })
 
         return angles[:3]
 
-    return text
+    return "\n".join(content).strip()
@@ -0,0 +1,101 @@
+"""
+Semantic Cache Module - Reuse research for topics that mean the same thing
+"""
+
+import math
+import time
+from typing import Optional
+
+from src.cache import CACHE_TTL, cache_get, cache_set, get_cache, prompt_key
+from src.gemini_client import get_client
+from src.ratelimit import limiter, retry_on_transient_error
+
+EMBEDDING_MODEL = "text-embedding-004"
+
+# Cosine similarity at or above which two topics count as the same
+SIMILARITY_THRESHOLD = 0.92
+
+# Oldest entries are dropped beyond this many topics per research model
+MAX_ENTRIES = 500
+
+
+# Embeddings are optional, so don't hold up research for long retrying them
+@retry_on_transient_error(max_attempts=2)
+def embed_topic(topic: str, api_key: str) -> list:
+    """
+    Embed a topic as a unit-length vector, so a dot product is cosine similarity.
+    """
+    cache_key = prompt_key(EMBEDDING_MODEL, topic, {})
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    client = get_client(api_key)
+    with limiter:
+        result = client.models.embed_content(model=EMBEDDING_MODEL, contents=topic)
+
+    values = result.embeddings[0].values
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    vector = [v / norm for v in values]
+
+    cache_set(cache_key, vector)
+    return vector
+
+
+def find_similar_research(embedding: list, model: str) -> Optional[dict]:
+    """
+    Find cached research for the topic most similar to the given embedding.
+
+    Args:
+        embedding: Unit-length topic embedding from embed_topic
+        model: Research model the cached research must come from
+
+    Returns:
+        The research dict, or None if no topic is similar enough
+    """
+    matches = []
+    for entry in _live_entries(get_cache().get(_index_key(model), [])):
+        score = sum(a * b for a, b in zip(embedding, entry["embedding"]))
+        if score >= SIMILARITY_THRESHOLD:
+            matches.append((score, entry["research_key"]))
+
+    # The research itself may have been evicted; fall back to the next best
+    for _, research_key in sorted(matches, reverse=True):
+        research = cache_get(research_key)
+        if research is not None:
+            return research
+    return None
+
+
+def remember_research(topic: str, embedding: list, research_key: str, model: str) -> None:
+    """
+    Add a topic to the semantic index.
+
+    Args:
+        topic: The researched topic
+        embedding: Unit-length topic embedding from embed_topic
+        research_key: Cache key the research is stored under
+        model: Research model the research came from
+    """
+    cache = get_cache()
+    key = _index_key(model)
+    with cache.transact():
+        entries = _live_entries(cache.get(key, []))
+        entries.append({
+            "topic": topic,
+            "embedding": embedding,
+            "research_key": research_key,
+            "created": time.time()
+        })
+        cache.set(key, entries[-MAX_ENTRIES:], expire=CACHE_TTL)
+
+
+def _live_entries(entries: list) -> list:
+    """Drop index entries older than CACHE_TTL, like the research they point to."""
+    cutoff = time.time() - CACHE_TTL
+    return [entry for entry in entries if entry.get("created", 0) > cutoff]
+
+
+def _index_key(model: str) -> str:
+    """Cache key of the semantic index for one research model."""
+    return f"semantic-research:{model}:{EMBEDDING_MODEL}"